@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.forms.models import BaseInlineFormSet
@@ -19,6 +21,17 @@ from .models import (
 # Helpers
 # -----------------------------
 
+# Rarity → (min, max) ability count, frozen once at import instead of
+# rebuilt on every formset clean.
+_RARITY_ABILITY_RULES = MappingProxyType({
+    "Common": (1, 2),
+    "Uncommon": (2, 2),
+    "Rare": (2, 3),
+    "Epic": (3, 4),
+    "Legendary": (4, 4),
+})
+
+
 class HeroAbilityInlineFormSet(BaseInlineFormSet):
     """
     Enforce:
@@ -29,41 +42,31 @@ class HeroAbilityInlineFormSet(BaseInlineFormSet):
     def clean(self):
         super().clean()
 
-        # inline forms can be empty/deleted
-        forms = [
-            f for f in self.forms
-            if hasattr(f, "cleaned_data")
-            and f.cleaned_data
-            and not f.cleaned_data.get("DELETE", False)
-        ]
-
-        # Slot validation + uniqueness in the inline UI
-        slots = []
-        for f in forms:
-            slot = f.cleaned_data.get("slot")
+        # Single pass: skip empty/deleted inline forms, count the live
+        # ones and validate slots with a set as we go.
+        count = 0
+        seen_slots = set()
+        for f in self.forms:
+            cleaned = getattr(f, "cleaned_data", None)
+            if not cleaned or cleaned.get("DELETE", False):
+                continue
+            count += 1
+
+            slot = cleaned.get("slot")
             if slot is None:
                 continue
             if slot < 1 or slot > 4:
                 raise ValidationError("Ability slot must be between 1 and 4.")
-            slots.append(slot)
-
-        if len(slots) != len(set(slots)):
-            raise ValidationError("Duplicate ability slots detected. Each slot (1-4) must be unique.")
+            if slot in seen_slots:
+                raise ValidationError("Duplicate ability slots detected. Each slot (1-4) must be unique.")
+            seen_slots.add(slot)
 
         # Rarity rule (only if we have a parent instance)
         hero = getattr(self, "instance", None)
         if not hero or not getattr(hero, "rarity", None):
             return
 
-        count = len(forms)
-        rules = {
-            "Common": (1, 2),
-            "Uncommon": (2, 2),
-            "Rare": (2, 3),
-            "Epic": (3, 4),
-            "Legendary": (4, 4),
-        }
-        min_n, max_n = rules.get(hero.rarity, (1, 4))
+        min_n, max_n = _RARITY_ABILITY_RULES.get(hero.rarity, (1, 4))
         if not (min_n <= count <= max_n):
             raise ValidationError(
                 f"{hero.rarity} heroes must have {min_n}-{max_n} abilities, but you selected {count}."
@@ -74,16 +77,33 @@ class HeroAbilityInlineFormSet(BaseInlineFormSet):
 # Asset Admin
 # -----------------------------
 
+class KeyPrefixAutocompleteMixin:
+    """
+    Asset tables are searched by `key`, which is unique (so indexed).
+    The default autocomplete endpoint runs an unanchored LIKE %q% scan;
+    serve it with a prefix match instead so the index is usable, and
+    return nothing for an empty query rather than paging the whole table.
+    Changelist search keeps the default (substring) behaviour.
+    """
+    def get_search_results(self, request, queryset, search_term):
+        if request.path.endswith("/autocomplete/"):
+            if not search_term:
+                return queryset.none(), False
+            return queryset.filter(key__istartswith=search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+
 @admin.register(AssetImage)
-class AssetImageAdmin(admin.ModelAdmin):
+class AssetImageAdmin(KeyPrefixAutocompleteMixin, admin.ModelAdmin):
     list_display = ("key", "width", "height")
     search_fields = ("key",)
     list_filter = ("width", "height")
 
 
 @admin.register(SpriteSheet)
-class SpriteSheetAdmin(admin.ModelAdmin):
+class SpriteSheetAdmin(KeyPrefixAutocompleteMixin, admin.ModelAdmin):
     list_display = ("key", "sheet", "frame_w", "frame_h", "directions", "frames_per_direction", "fps")
+    list_select_related = ("sheet",)
     search_fields = ("key",)
     list_filter = ("frame_w", "frame_h", "fps")
     autocomplete_fields = ("sheet",)
@@ -110,7 +130,11 @@ class HeroAbilityLoadoutInline(admin.TabularInline):
     formset = HeroAbilityInlineFormSet
     extra = 0
     fields = ("slot", "ability")
-    autocomplete_fields = ("ability",)
+    # raw_id instead of autocomplete: the ability catalog is the one table
+    # expected to grow into the thousands, and autocomplete pays a Select2
+    # init + AJAX round-trip per inline row. raw_id renders a plain input
+    # with a lookup popup regardless of table size.
+    raw_id_fields = ("ability",)
     ordering = ("slot",)
 
 
@@ -126,6 +150,11 @@ class HeroBaseAdmin(admin.ModelAdmin):
 
     inlines = [HeroAbilityLoadoutInline]
 
+    def get_queryset(self, request):
+        # Inline loadout rows render each ability FK; prefetch them so a
+        # change form doesn't issue one query per row.
+        return super().get_queryset(request).prefetch_related("ability_loadout__ability")
+
 
 # -----------------------------
 # Existing Admin
@@ -134,6 +163,7 @@ class HeroBaseAdmin(admin.ModelAdmin):
 @admin.register(HeroInstance)
 class HeroInstanceAdmin(admin.ModelAdmin):
     list_display = ("owner", "hero_base", "level", "xp")
+    list_select_related = ("owner", "hero_base")
     list_filter = ("owner", "hero_base")
     search_fields = ("owner__username", "hero_base__name")
     autocomplete_fields = ("owner", "hero_base")
@@ -142,5 +172,6 @@ class HeroInstanceAdmin(admin.ModelAdmin):
 @admin.register(PlayerProfile)
 class PlayerProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "coins")
+    list_select_related = ("user",)
     search_fields = ("user__username",)
     autocomplete_fields = ("user",)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import random
+import uuid
 from dataclasses import dataclass, field
+from operator import itemgetter
 from typing import Any, List, Optional
 
 from .stats import calc_stats
-from .kits import get_kit_for
+from .abilities import Ability
+from .kits import get_kit_for, get_kit_for_faction
 
 # =========================
 # CONFIG
@@ -16,6 +19,11 @@ SPEED_TO_AP_DIVISOR = 40
 DEFAULT_TICK_LIMIT = 100
 DEFAULT_TICK_LIMIT_STEP = 400
 
+# Max events kept in a persisted battle state. The UI only ever shows a
+# 30-entry tail; without a cap a long battle re-serializes an unbounded
+# log into the session on every step.
+LOG_CAP = 512
+
 PHASE_RUNNING = "RUNNING"
 PHASE_PLAYER_PAUSE = "PLAYER_PAUSE"
 PHASE_ENDED = "ENDED"
@@ -27,7 +35,7 @@ ROWS_3 = ("front", "mid", "back")
 # RUNTIME TYPES
 # =========================
 
-@dataclass
+@dataclass(slots=True)
 class UnitRuntime:
     tag: str  # unique string for logs ("p:123" or "e:0")
     id: int | None
@@ -39,44 +47,213 @@ class UnitRuntime:
     hp: int
     max_hp: int
     faction: str = ""  # REQUIRED for re-hydrating kits
+    side: str = ""  # "player" / "enemy"
     ap: int = 0
     abilities: list = field(default_factory=list)
 
+    # Per-hook views of `abilities`, holding only abilities that actually
+    # override that hook (see _index_ability_hooks). The hot loops iterate
+    # these, so units whose kit has no on_tick pay nothing per tick.
+    abilities_on_tick: list = field(default_factory=list)
+    abilities_on_action: list = field(default_factory=list)
+    abilities_on_hit: list = field(default_factory=list)
+    abilities_on_death: list = field(default_factory=list)
+
+    # Hot-path copies of stats entries; plain attribute loads beat dict
+    # probes in the tick loop. `stats` stays the source of truth for
+    # serialization and anything cold.
+    speed: int = 0
+    atk: int = 0
+    def_: int = 0
+    ap_per_tick: int = 1  # constant for the whole battle, derived from speed
+
     # Per-battle contribution stats (for XP)
     damage_dealt: int = 0
     kills: int = 0
 
-    # Per-action mods
-    temp_mods: dict = field(default_factory=dict)
+    # Per-action mods, reset to 1.0 before each action's on_action hooks.
+    # Plain floats instead of a temp_mods dict: no per-action allocation.
+    phys_mult_temp: float = 1.0
+    magic_mult_temp: float = 1.0
 
-    @property
-    def alive(self):
-        return self.hp > 0
+    # Plain flag instead of a property: flipped once at death in
+    # _execute_attack, so the hot loops read a slot, not a descriptor.
+    alive: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class BattleContext:
     tick: int
     log: list
     player_units: list[UnitRuntime]
     enemy_units: list[UnitRuntime]
     seed: int | None = None
+    rng: random.Random = field(default_factory=random.Random)
+
+    # Running alive counts, decremented on death in _execute_attack.
+    # Makes the per-tick win/loss check O(1) instead of a generator scan.
+    player_alive: int = 0
+    enemy_alive: int = 0
+
+    # Cached targetable lists keyed by id(squad list). Deaths are the only
+    # thing that changes targetability mid-battle, so _execute_attack
+    # clears this on a kill; every other action reuses the cached list.
+    _target_cache: dict = field(default_factory=dict)
+
+    # Set in __post_init__ (bound-method cache for the log).
+    _append: Any = None
+
+    def targetable(self, squad: list[UnitRuntime]) -> list[UnitRuntime]:
+        key = id(squad)
+        cached = self._target_cache.get(key)
+        if cached is None:
+            cached = _targetable_enemies(squad)
+            self._target_cache[key] = cached
+        return cached
+
+    def __post_init__(self):
+        self.player_alive = sum(1 for u in self.player_units if u.alive)
+        self.enemy_alive = sum(1 for u in self.enemy_units if u.alive)
+        # Bound-method cache: event() is called from the hottest paths
+        # (every attack/death), this skips the log attribute + append
+        # lookup per call. ctx.event stays the API for emitters.
+        self._append = self.log.append
 
     def event(self, tick, type_, source, target, value=None, meta=None):
-        self.log.append({
-            "tick": tick,
-            "type": type_,
-            "source": source,
-            "target": target,
-            "value": value,
-            "meta": meta or {}
-        })
+        # Events are stored as compact tuples, not dicts — one small
+        # allocation per event instead of a 6-key dict plus meta dict.
+        # _event_to_dict materializes the dict shape for snapshots.
+        self._append((tick, type_, source, target, value, meta))
+
+
+# =========================
+# RUNTIME CACHE
+# =========================
+
+# In-process cache of hydrated units, keyed by state["battle_id"].
+# Step endpoints hit this instead of rebuilding every UnitRuntime (and
+# re-instantiating kits) from the session dicts on each HTTP call.
+# The state dict remains the source of truth: on a cache miss (other
+# worker, restart) we hydrate from it as before.
+# Bounded so abandoned battles can't grow it without limit; dicts keep
+# insertion order, so the first key is always the oldest entry.
+_BATTLE_CACHE: dict[str, tuple[list[UnitRuntime], list[UnitRuntime]]] = {}
+_BATTLE_CACHE_MAX = 256
+
+
+def battle_state_discard(state: dict) -> None:
+    """
+    Drop the cached runtime units for this battle (e.g. when a view
+    abandons or replaces a battle without playing it to the end).
+    """
+    _BATTLE_CACHE.pop(state.get("battle_id"), None)
+
+
+def _index_ability_hooks(u: UnitRuntime) -> None:
+    """
+    Split u.abilities into per-hook lists containing only abilities that
+    override the hook. Default Ability hooks are no-ops; skipping them
+    here removes thousands of empty method calls per battle.
+    """
+    u.abilities_on_tick = [ab for ab in u.abilities
+                           if type(ab).on_tick is not Ability.on_tick]
+    u.abilities_on_action = [ab for ab in u.abilities
+                             if type(ab).on_action is not Ability.on_action]
+    u.abilities_on_hit = [ab for ab in u.abilities
+                          if type(ab).on_hit is not Ability.on_hit]
+    u.abilities_on_death = [ab for ab in u.abilities
+                            if type(ab).on_death is not Ability.on_death]
+
+
+def _rehydrate_kits(units: list[UnitRuntime]) -> None:
+    for u in units:
+        u.abilities = get_kit_for_faction(u.faction)
+        _index_ability_hooks(u)
+
+
+def _load_battle_units(state: dict) -> tuple[list[UnitRuntime], list[UnitRuntime]]:
+    """
+    Return (player_units, enemy_units) for this state, from cache when
+    possible, otherwise hydrated from the serialized dicts.
+    """
+    bid = state.get("battle_id")
+    if bid:
+        cached = _BATTLE_CACHE.get(bid)
+        if cached is not None:
+            return cached
+
+    player_units = [_unit_from_dict(d) for d in state["player_units"]]
+    enemy_units = [_unit_from_dict(d) for d in state["enemy_units"]]
+    _rehydrate_kits(player_units)
+    _rehydrate_kits(enemy_units)
+
+    if bid:
+        _cache_put(bid, player_units, enemy_units)
+    return player_units, enemy_units
+
+
+def _cache_put(bid: str, player_units, enemy_units) -> None:
+    while len(_BATTLE_CACHE) >= _BATTLE_CACHE_MAX:
+        _BATTLE_CACHE.pop(next(iter(_BATTLE_CACHE)))
+    _BATTLE_CACHE[bid] = (player_units, enemy_units)
+
+
+def _rng_for_state(state: dict) -> random.Random:
+    """
+    Battle-local RNG. Restores the persisted Mersenne state if the battle
+    has stepped before (re-seeding every step would both replay the same
+    rolls and redo the ~624-word MT init); otherwise seeds from
+    state["seed"] (or entropy when seed is None).
+    """
+    rng = random.Random()
+    saved = state.get("rng_state")
+    if saved is not None:
+        # JSON round-trips tuples as lists; setstate wants tuples back.
+        rng.setstate((saved[0], tuple(saved[1]), saved[2]))
+    else:
+        rng.seed(state.get("seed"))
+    return rng
+
+
+def _save_rng(state: dict, rng: random.Random) -> None:
+    version, internal, gauss = rng.getstate()
+    state["rng_state"] = [version, list(internal), gauss]
+
+
+def _store_battle_units(state: dict, player_units, enemy_units) -> None:
+    """
+    Write units back to the serializable state (persistence boundary).
+    Drops the cache entry once the battle is over.
+    """
+    state["player_units"] = [_unit_to_dict(u) for u in player_units]
+    state["enemy_units"] = [_unit_to_dict(u) for u in enemy_units]
+    if state["phase"] == PHASE_ENDED:
+        _BATTLE_CACHE.pop(state.get("battle_id"), None)
 
 
 # =========================
 # SERIALIZATION
 # =========================
 
+def _event_to_dict(e) -> dict:
+    """
+    Expand a stored event record into the dict shape the frontend reads.
+    Accepts tuples (runtime), lists (tuples after a JSON round-trip) and
+    dicts (pre-tuple battle states still in sessions).
+    """
+    if isinstance(e, dict):
+        return e
+    tick, type_, source, target, value, meta = e
+    return {
+        "tick": tick,
+        "type": type_,
+        "source": source,
+        "target": target,
+        "value": value,
+        "meta": meta or {},
+    }
+
+
 def _unit_to_dict(u: UnitRuntime) -> dict:
     """
     Convert runtime unit to JSON-serializable dict.
@@ -94,11 +271,12 @@ def _unit_to_dict(u: UnitRuntime) -> dict:
         "hp": u.hp,
         "max_hp": u.max_hp,
         "faction": u.faction,
+        "side": u.side,
         "ap": u.ap,
         "damage_dealt": u.damage_dealt,
         "kills": u.kills,
-        # temp_mods are transient per action, usually safe to reset or store if needed.
-        # For MVP we reset them.
+        # per-action multipliers are transient; they reset before each
+        # action, so we don't persist them.
     }
 
 def _unit_from_dict(d: dict) -> UnitRuntime:
@@ -113,10 +291,17 @@ def _unit_from_dict(d: dict) -> UnitRuntime:
         hp=d["hp"],
         max_hp=d["max_hp"],
         faction=d.get("faction", ""),
+        # Fallback from the tag prefix for states saved before side existed
+        side=d.get("side") or ("player" if d["tag"].startswith("p") else "enemy"),
         ap=d.get("ap", 0),
         damage_dealt=d.get("damage_dealt", 0),
         kills=d.get("kills", 0),
         abilities=[],  # Will be re-hydrated
+        alive=d["hp"] > 0,
+        speed=int(d["stats"].get("speed", 10)),
+        atk=int(d["stats"].get("atk", 0)),
+        def_=int(d["stats"].get("def", 0)),
+        ap_per_tick=max(1, int(d["stats"].get("speed", 10)) // SPEED_TO_AP_DIVISOR),
     )
 
 
@@ -145,11 +330,17 @@ def build_units_from_instances(side: str, instances: list, formation: dict) -> l
             hp=st["hp"],
             max_hp=st["hp"],
             faction=inst.hero_base.faction,  # Store faction for kit lookup
+            side=side,
             ap=random.randint(0, 20),  # minor stagger
+            speed=int(st["speed"]),
+            atk=int(st["atk"]),
+            def_=int(st["def"]),
+            ap_per_tick=max(1, int(st["speed"]) // SPEED_TO_AP_DIVISOR),
         )
         
         # Initial kit load
         u.abilities = get_kit_for(inst.hero_base)
+        _index_ability_hooks(u)
         out.append(u)
     return out
 
@@ -173,15 +364,59 @@ def build_enemy_units(bases: list, level=1) -> list[UnitRuntime]:
             hp=st["hp"],
             max_hp=st["hp"],
             faction=base.faction,
+            side="enemy",
             ap=random.randint(0, 20),
+            speed=int(st["speed"]),
+            atk=int(st["atk"]),
+            def_=int(st["def"]),
+            ap_per_tick=max(1, int(st["speed"]) // SPEED_TO_AP_DIVISOR),
         )
         u.abilities = get_kit_for(base)
+        _index_ability_hooks(u)
+        out.append(u)
+    return out
+
+
+def build_enemy_units_from_template(base, count: int, level=1) -> list[UnitRuntime]:
+    """
+    Spawn `count` identical enemies from one base. Avoids building a
+    [base] * count list and re-resolving stats/kit per unit the way
+    build_enemy_units(bases) does for mixed squads.
+    """
+    st = calc_stats(base, level)
+    kit = get_kit_for(base)
+    speed = int(st["speed"])
+    out = []
+    for i in range(count):
+        u = UnitRuntime(
+            tag=f"e:{i}",
+            id=None,  # Enemy mobs usually don't have DB IDs
+            name=base.name,
+            level=level,
+            # simplistic enemy formation: fill front, then mid
+            row="front" if i < 3 else "mid",
+            slot=i % 3,
+            stats=dict(st),
+            hp=st["hp"],
+            max_hp=st["hp"],
+            faction=base.faction,
+            side="enemy",
+            ap=random.randint(0, 20),
+            speed=speed,
+            atk=int(st["atk"]),
+            def_=int(st["def"]),
+            ap_per_tick=max(1, speed // SPEED_TO_AP_DIVISOR),
+        )
+        u.abilities = kit
+        _index_ability_hooks(u)
         out.append(u)
     return out
 
 
 def battle_state_new(player_units, enemy_units, seed=None, tick_limit=DEFAULT_TICK_LIMIT):
-    return {
+    battle_id = uuid.uuid4().hex
+    state = {
+        "battle_id": battle_id,
         "phase": PHASE_RUNNING,
         "tick": 0,
         "tick_limit": tick_limit,
@@ -191,26 +426,19 @@ def battle_state_new(player_units, enemy_units, seed=None, tick_limit=DEFAULT_TI
         "seed": seed,
         "winner": None,
     }
+    # The freshly built units already carry their kits; cache them so the
+    # first advance call doesn't re-hydrate.
+    _cache_put(battle_id, player_units, enemy_units)
+    return state
 
 
 def battle_state_advance_until_pause(state: dict) -> dict:
     if state["phase"] == PHASE_ENDED:
         return state
 
-    # 1. Deserialize
-    player_units = [_unit_from_dict(d) for d in state["player_units"]]
-    enemy_units = [_unit_from_dict(d) for d in state["enemy_units"]]
-    
-    # 2. RE-HYDRATE KITS (Critical Fix)
-    # We need a mock object because get_kit_for expects a model with a .faction attribute
-    @dataclass
-    class MockHeroBase:
-        faction: str
-
+    # 1. Load runtime units (cache hit skips deserialize + kit re-hydration)
+    player_units, enemy_units = _load_battle_units(state)
     all_units = player_units + enemy_units
-    for u in all_units:
-        mock_base = MockHeroBase(faction=u.faction)
-        u.abilities = get_kit_for(mock_base)
 
     # 3. Setup Context
     ctx = BattleContext(
@@ -219,6 +447,7 @@ def battle_state_advance_until_pause(state: dict) -> dict:
         player_units=player_units,
         enemy_units=enemy_units,
         seed=state.get("seed"),
+        rng=_rng_for_state(state),
     )
 
     limit = state["tick_limit"]
@@ -226,36 +455,37 @@ def battle_state_advance_until_pause(state: dict) -> dict:
     # 4. Resume Loop
     while ctx.tick < limit:
         # Check Win/Loss
-        if not any(u.alive for u in player_units):
+        if ctx.player_alive == 0:
             state["phase"] = PHASE_ENDED
             state["winner"] = "enemy"
             break
-        if not any(u.alive for u in enemy_units):
+        if ctx.enemy_alive == 0:
             state["phase"] = PHASE_ENDED
             state["winner"] = "player"
             break
 
-        # A. Start Tick hooks
+        # A+B. Tick hooks + AP growth, fused into one pass over all_units
+        # (one alive check per unit instead of two; hooks stay first so a
+        # unit's on_tick runs before it can act this tick).
+        ready_player = None
+        ready_speed = -1
         for u in all_units:
             if u.alive:
-                for ab in u.abilities:
+                for ab in u.abilities_on_tick:
                     ab.on_tick(ctx, u)
 
-        # B. AP Growth
-        ready_player = None
-        for u in all_units:
-            if u.alive:
-                speed = u.stats.get("speed", 10)
-                # Gain AP
-                gain = max(1, speed // SPEED_TO_AP_DIVISOR)
-                u.ap += gain
-                
+                # Gain AP (rate precomputed at build time)
+                u.ap += u.ap_per_tick
+
                 # Check ready
                 if u.ap >= TURN_THRESHOLD:
-                    if u in player_units:
-                        # If multiple players ready, pick first (simplest)
-                        if ready_player is None:
+                    if u.side == "player":
+                        # If multiple players ready, fastest acts first.
+                        # Single-pass argmax; coin-flip only on a speed tie.
+                        if (u.speed > ready_speed
+                                or (u.speed == ready_speed and ctx.rng.random() < 0.5)):
                             ready_player = u
+                            ready_speed = u.speed
                     else:
                         # Enemy acts immediately (AI)
                         _resolve_turn(ctx, u, is_player=False)
@@ -265,15 +495,21 @@ def battle_state_advance_until_pause(state: dict) -> dict:
         # allowing the UI to send an act command.
         if ready_player:
             state["phase"] = PHASE_PLAYER_PAUSE
+            # Remember who paused us so the act endpoint doesn't rescan
+            # (and doesn't grab a different ready unit than the argmax
+            # picked here).
+            state["ready_tag"] = ready_player.tag
             break
 
         ctx.tick += 1
 
     # 5. Save State
     state["tick"] = ctx.tick
-    state["log"] = ctx.log # logs appended in place
-    state["player_units"] = [_unit_to_dict(u) for u in player_units]
-    state["enemy_units"] = [_unit_to_dict(u) for u in enemy_units]
+    # logs appended in place; trim the persisted tail so the session
+    # payload stays bounded
+    state["log"] = ctx.log if len(ctx.log) <= LOG_CAP else ctx.log[-LOG_CAP:]
+    _save_rng(state, ctx.rng)
+    _store_battle_units(state, player_units, enemy_units)
 
     # XP Calculation (embedded in result if ended)
     if state["phase"] == PHASE_ENDED and state["winner"] == "player":
@@ -296,26 +532,27 @@ def battle_state_player_basic_attack(state: dict, target_side: str, target_row:
     if state["phase"] != PHASE_PLAYER_PAUSE:
         return state
 
-    # Re-load
-    player_units = [_unit_from_dict(d) for d in state["player_units"]]
-    enemy_units = [_unit_from_dict(d) for d in state["enemy_units"]]
-    
-    # Re-hydrate kits needed for on_action/on_hit
-    @dataclass
-    class MockHeroBase:
-        faction: str
-    for u in player_units + enemy_units:
-        u.abilities = get_kit_for(MockHeroBase(faction=u.faction))
+    # Re-load (cache hit skips deserialize + kit re-hydration)
+    player_units, enemy_units = _load_battle_units(state)
 
     ctx = BattleContext(
         tick=state["tick"],
         log=state["log"],
         player_units=player_units,
         enemy_units=enemy_units,
+        seed=state.get("seed"),
+        rng=_rng_for_state(state),
     )
 
-    # Find the actor (first ready player unit)
-    actor = next((u for u in player_units if u.alive and u.ap >= TURN_THRESHOLD), None)
+    # Find the actor: the unit recorded at pause time, falling back to a
+    # ready-scan for states saved before ready_tag existed.
+    ready_tag = state.get("ready_tag")
+    actor = None
+    if ready_tag:
+        actor = next((u for u in player_units
+                      if u.tag == ready_tag and u.alive and u.ap >= TURN_THRESHOLD), None)
+    if actor is None:
+        actor = next((u for u in player_units if u.alive and u.ap >= TURN_THRESHOLD), None)
     if not actor:
         # Should not happen if logic is sound, but safety first
         state["phase"] = PHASE_RUNNING
@@ -332,16 +569,21 @@ def battle_state_player_basic_attack(state: dict, target_side: str, target_row:
         _execute_attack(ctx, actor, target)
         actor.ap -= TURN_THRESHOLD  # Deduct AP
         state["phase"] = PHASE_RUNNING  # Resume
+        state["ready_tag"] = None  # consumed
     else:
-        # Invalid target selected
-        # In a real app, return error. For MVP, log it.
+        # Invalid target selected: nothing mutated, so skip the unit
+        # re-serialization entirely. The error event lands in state["log"]
+        # directly (ctx.log aliases it) and no RNG was consumed.
         ctx.event(ctx.tick, "error", actor.tag, None, meta={"msg": "Invalid target"})
+        return state
 
-    # Save
+    # Save (only reached when an attack actually resolved)
     state["tick"] = ctx.tick
-    state["player_units"] = [_unit_to_dict(u) for u in player_units]
-    state["enemy_units"] = [_unit_to_dict(u) for u in enemy_units]
-    
+    if len(ctx.log) > LOG_CAP:
+        state["log"] = ctx.log[-LOG_CAP:]
+    _save_rng(state, ctx.rng)
+    _store_battle_units(state, player_units, enemy_units)
+
     return state
 
 
@@ -354,7 +596,7 @@ def battle_state_snapshot(state: dict) -> dict:
         "tick_limit": state["tick_limit"],
         "phase": state["phase"],
         "winner": state["winner"],
-        "log": state.get("log", [])[-30:],  # last 30 entries
+        "log": [_event_to_dict(e) for e in state.get("log", [])[-30:]],  # last 30 entries
         "player": _squad_snapshot(state["player_units"]),
         "enemy": _squad_snapshot(state["enemy_units"]),
         "xp": state.get("xp", {})
@@ -362,19 +604,17 @@ def battle_state_snapshot(state: dict) -> dict:
 
 
 def _squad_snapshot(unit_dicts: list[dict]) -> dict:
-    # Group by row for easier UI rendering
+    # Group by row for easier UI rendering.
+    # We send everything (dead included); the UI decides visibility.
     rows = {"front": [], "mid": [], "back": []}
     for d in unit_dicts:
-        if d["hp"] > 0:  # Only send living units? Or all? 
-            # Send all so we can show dead bodies if we want, or just filter in UI
-            pass
-        # We send everything, UI decides visibility
         rows[d["row"]].append(d)
-    
-    # Sort by slot
-    for k in rows:
-        rows[k].sort(key=lambda x: x["slot"])
-        
+
+    # Sort by slot (itemgetter beats a lambda, and rows are tiny)
+    slot_of = itemgetter("slot")
+    for row in rows.values():
+        row.sort(key=slot_of)
+
     return rows
 
 
@@ -387,33 +627,39 @@ def _resolve_turn(ctx: BattleContext, actor: UnitRuntime, is_player: bool):
     AI Logic / Auto-Battle resolution.
     """
     targets = ctx.player_units if not is_player else ctx.enemy_units
-    target = _choose_target(actor, targets)
-    
+    target = _choose_target(ctx, actor, targets)
+
     if target:
         _execute_attack(ctx, actor, target)
-    
+
     actor.ap -= TURN_THRESHOLD
 
 
-def _choose_target(actor: UnitRuntime, enemies: list[UnitRuntime]) -> Optional[UnitRuntime]:
+def _choose_target(ctx: BattleContext, actor: UnitRuntime, enemies: list[UnitRuntime]) -> Optional[UnitRuntime]:
     """
     Simple AI: Prioritize Front -> Mid -> Back.
     """
-    candidates = _targetable_enemies(enemies)
+    candidates = ctx.targetable(enemies)
     if not candidates:
         return None
-    return random.choice(candidates)
+    return ctx.rng.choice(candidates)
 
 
 def _targetable_enemies(units: list[UnitRuntime]) -> list[UnitRuntime]:
-    alive = [u for u in units if u.alive]
-    front = [u for u in alive if u.row == "front"]
-    mid = [u for u in alive if u.row == "mid"]
-    back = [u for u in alive if u.row == "back"]
-
-    if front: return front
-    if mid: return mid
-    return back
+    # Single pass: bucket living units by row, then apply the
+    # front -> mid -> back reachability rule.
+    front: list[UnitRuntime] = []
+    mid: list[UnitRuntime] = []
+    back: list[UnitRuntime] = []
+    for u in units:
+        if u.alive:
+            if u.row == "front":
+                front.append(u)
+            elif u.row == "mid":
+                mid.append(u)
+            else:
+                back.append(u)
+    return front or mid or back
 
 def _is_targetable(target: UnitRuntime, squad: list[UnitRuntime]) -> bool:
     """
@@ -426,21 +672,23 @@ def _is_targetable(target: UnitRuntime, squad: list[UnitRuntime]) -> bool:
 
 def _execute_attack(ctx: BattleContext, actor: UnitRuntime, target: UnitRuntime):
     # 1. Hooks (On Action)
-    for ab in actor.abilities:
+    actor.phys_mult_temp = 1.0
+    actor.magic_mult_temp = 1.0
+    for ab in actor.abilities_on_action:
         ab.on_action(ctx, actor, target)
 
     # 2. Calc Damage
     # Basic formula: (Atk - Def) * Multiplier
-    atk = actor.stats["atk"]
-    defense = target.stats["def"]
-    
+    atk = actor.atk
+    defense = target.def_
+
     # Mitigation: Armor style (Damage = Atk * 100 / (100 + Def))
     # OR Flat reduction with floor.
     # MVP Flat: max(1, atk - def)
     raw_dmg = max(1, atk - defense)
     
     # Random variance +/- 10%
-    variance = random.uniform(0.9, 1.1)
+    variance = ctx.rng.uniform(0.9, 1.1)
     final_dmg = int(raw_dmg * variance)
 
     # 3. Apply
@@ -453,14 +701,20 @@ def _execute_attack(ctx: BattleContext, actor: UnitRuntime, target: UnitRuntime)
     actor.damage_dealt += final_dmg
 
     # 6. On Hit hooks
-    for ab in actor.abilities:
+    for ab in actor.abilities_on_hit:
         ab.on_hit(ctx, actor, target, final_dmg)
 
     # 7. Death?
     if target.hp == 0:
+        target.alive = False
         ctx.event(ctx.tick, "death", target.tag, None)
         actor.kills += 1
-        for ab in target.abilities:
+        ctx._target_cache.clear()  # targetability changed
+        if target.side == "player":
+            ctx.player_alive -= 1
+        else:
+            ctx.enemy_alive -= 1
+        for ab in target.abilities_on_death:
             ab.on_death(ctx, target)
 
 
@@ -479,9 +733,8 @@ def run_battle(player_units, enemy_units, seed=None, tick_limit=DEFAULT_TICK_LIM
     # effectively acting as an "Auto-Battle"
     while state["phase"] == PHASE_PLAYER_PAUSE:
         # Simulate player choice: pick random valid target
-        p_units = [_unit_from_dict(d) for d in state["player_units"]]
-        e_units = [_unit_from_dict(d) for d in state["enemy_units"]]
-        
+        p_units, e_units = _load_battle_units(state)
+
         actor = next((u for u in p_units if u.alive and u.ap >= TURN_THRESHOLD), None)
         if actor:
             targets = [u for u in e_units if u.alive] # simplify target logic for auto
@@ -14,13 +14,24 @@ class BackRowChannel(Ability):
     def on_action(self, ctx, unit, target):
         # tiny bonus magic damage if in back row (stacks with formation bonus)
         if unit.row == "back":
-            unit.temp_mods["magic_mult"] *= 1.05
+            unit.magic_mult_temp *= 1.05
             ctx.event(ctx.tick, "passive", unit.tag, None, None, {"name": self.name, "effect": "+5% magic mult this action"})
 
-def get_kit_for(hero_base) -> list[Ability]:
+# Faction -> shared kit tuples, built once at import. Abilities are
+# stateless (hooks mutate the unit/ctx, never self), so one instance can
+# safely serve every unit; per-call construction was pure churn.
+_KITS: dict[str, tuple[Ability, ...]] = {
+    "Undead": (UndeadResilience(),),
+    "Wild": (BackRowChannel(),),
+}
+
+_EMPTY_KIT: tuple[Ability, ...] = ()
+
+
+def get_kit_for_faction(faction: str) -> tuple[Ability, ...]:
+    return _KITS.get(faction, _EMPTY_KIT)
+
+
+def get_kit_for(hero_base) -> tuple[Ability, ...]:
     # minimal mapping: faction -> passives
-    if hero_base.faction == "Undead":
-        return [UndeadResilience()]
-    if hero_base.faction == "Wild":
-        return [BackRowChannel()]
-    return []
+    return _KITS.get(hero_base.faction, _EMPTY_KIT)
@@ -38,22 +38,19 @@ def get_squad_limit(hero_instances) -> int:
 # HELPERS
 # ============================================================
 
+# Cell values treated as "empty". frozenset gives O(1) membership vs the
+# old per-cell tuple scan. (0 and "0" hash alike on purpose.)
+_EMPTY_CELLS = frozenset(("", "0", 0, None))
+
+
 def _pad_or_trim(row: List[Any], cols: int) -> List[Optional[int]]:
     """
     Normalizes a row to exactly `cols` length with None.
     Also converts "", "0", 0 to None and casts ints where possible.
     """
-    row = list(row or [])
-    out: List[Optional[int]] = []
-    for i in range(cols):
-        v = row[i] if i < len(row) else None
-        if v in ("", "0", 0):
-            v = None
-        if v is None:
-            out.append(None)
-        else:
-            out.append(int(v))
-    return out
+    row = list(row or [])[:cols]
+    row += [None] * (cols - len(row))
+    return [None if v in _EMPTY_CELLS else int(v) for v in row]
 
 
 def normalize_rows(front: list, back: list, mid: Optional[list] = None) -> Tuple[List[Optional[int]], Optional[List[Optional[int]]], List[Optional[int]]]:
@@ -131,24 +128,28 @@ def validate_squad(front: list, back: list, roster_by_id: dict, mid: Optional[li
             message="Pick at least 1 hero."
         )
 
-    if len(set(anchors)) != len(anchors):
-        raise RuleError(
-            code="DUPLICATE",
-            message="Duplicate hero selected."
-        )
-
-    # Ownership / validity
+    # Build the anchor set once; it serves the duplicate check here, the
+    # ownership check (issubset is C-level), and the occupancy pass below.
+    anchor_set = set()
     for hid in anchors:
-        if hid not in roster_by_id:
+        if hid in anchor_set:
             raise RuleError(
-                code="INVALID_HERO",
-                message="Invalid hero selected.",
-                details={"hero_id": hid}
+                code="DUPLICATE",
+                message="Duplicate hero selected."
             )
+        anchor_set.add(hid)
+
+    # Ownership / validity
+    if not anchor_set.issubset(roster_by_id):
+        bad = next(h for h in anchors if h not in roster_by_id)
+        raise RuleError(
+            code="INVALID_HERO",
+            message="Invalid hero selected.",
+            details={"hero_id": bad}
+        )
 
     # Occupancy cells must point at a real anchor (only matters in 3-row future layout)
     if occupied:
-        anchor_set = set(anchors)
         for hid in occupied:
             if hid not in anchor_set:
                 raise RuleError(
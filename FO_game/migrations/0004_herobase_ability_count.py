@@ -0,0 +1,27 @@
+# Generated by Django 5.2.17 on 2026-09-01 15:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_ability_counts(apps, schema_editor):
+    HeroBase = apps.get_model("FO_game", "HeroBase")
+    counted = HeroBase.objects.annotate(c=Count("ability_loadout"))
+    for hb in counted.exclude(c=0):
+        HeroBase.objects.filter(pk=hb.pk).update(ability_count=hb.c)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FO_game', '0003_assetimage_herobase_background_herobase_portrait_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='herobase',
+            name='ability_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ability_counts, migrations.RunPython.noop),
+    ]
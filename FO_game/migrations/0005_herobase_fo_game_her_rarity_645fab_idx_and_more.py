@@ -0,0 +1,21 @@
+# Generated by Django 5.2.17 on 2026-09-01 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FO_game', '0004_herobase_ability_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='herobase',
+            index=models.Index(fields=['rarity'], name='FO_game_her_rarity_645fab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='herobase',
+            index=models.Index(fields=['faction', 'rarity', 'name'], name='FO_game_her_faction_ea8283_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 
+from functools import lru_cache
+
+import math
 import random
 
 
@@ -136,6 +140,18 @@ class HeroBase(models.Model):
 
     base_idle_sheet = models.ForeignKey(SpriteSheet, null=True, blank=True, on_delete=models.SET_NULL, related_name="hero_idle_sheets")
 
+    # denormalized loadout size, kept current by the HeroAbilityLoadout
+    # signals — lets clean() validate without a COUNT(*) per call
+    ability_count = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # summon pool filter
+            models.Index(fields=["rarity"]),
+            # library_view ordering
+            models.Index(fields=["faction", "rarity", "name"]),
+        ]
+
     def clean(self):
         super().clean()
 
@@ -143,7 +159,7 @@ class HeroBase(models.Model):
         if not self.pk:
             return
 
-        count = self.ability_loadout.count()
+        count = self.ability_count
 
         rules = {
             "Common": (1, 2),
@@ -173,6 +189,71 @@ class PlayerProfile(models.Model):
 
 
 
+_RARITIES = ("Common", "Uncommon", "Rare", "Epic", "Legendary")
+_RARITY_WEIGHTS = (50, 30, 15, 4, 1)  # pull rates (%), design doc
+
+
+def _build_alias_table(weights):
+    """
+    Vose's alias method: O(n) setup here, O(1) per sample afterwards
+    (one randrange + one random, no cumulative-weight scan like
+    random.choices rebuilds on every call).
+    """
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, s in enumerate(scaled) if s < 1.0]
+    large = [i for i, s in enumerate(scaled) if s >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] += scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    return tuple(prob), tuple(alias)
+
+
+_RARITY_PROB, _RARITY_ALIAS = _build_alias_table(_RARITY_WEIGHTS)
+
+
+def _roll_rarity() -> str:
+    i = random.randrange(len(_RARITIES))
+    if random.random() >= _RARITY_PROB[i]:
+        i = _RARITY_ALIAS[i]
+    return _RARITIES[i]
+
+
+@lru_cache(maxsize=None)
+def _hero_base_pks(rarity: str | None = None) -> tuple[int, ...]:
+    """
+    Cached summon pool: pk lists per rarity (None = whole catalog).
+    The catalog changes only through admin/seed writes, which clear this
+    via the HeroBase signals in signals.py.
+    """
+    qs = HeroBase.objects.all()
+    if rarity is not None:
+        qs = qs.filter(rarity=rarity)
+    return tuple(qs.values_list("pk", flat=True))
+
+
+@lru_cache(maxsize=1)
+def _sporeling_pk() -> int | None:
+    """
+    Resolve the campaign enemy base ('Fungal Sporeling') once instead of
+    running up to three ILIKE queries on every battle start. Cleared by
+    the HeroBase signals alongside the summon pools.
+    """
+    hb = (
+        HeroBase.objects.filter(name__iexact="Fungal Sporeling").only("id").first()
+        or HeroBase.objects.filter(name__icontains="Fungal").filter(name__icontains="Spore").only("id").first()
+        or HeroBase.objects.filter(name__icontains="Sporeling").only("id").first()
+    )
+    return hb.pk if hb else None
+
+
 def summon_random_hero(profile: PlayerProfile, cost: int = 5000) -> HeroInstance | None:
     """
     Simple rarity-weighted summon.
@@ -182,32 +263,33 @@ def summon_random_hero(profile: PlayerProfile, cost: int = 5000) -> HeroInstance
     if profile.coins < cost:
         return None
 
-    rarities = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
-    weights  = [50,        30,         15,     4,      1]
-
-    chosen_rarity = random.choices(rarities, weights=weights, k=1)[0]
+    chosen_rarity = _roll_rarity()
 
-    pool = list(HeroBase.objects.filter(rarity=chosen_rarity))
-    if not pool:
+    pks = _hero_base_pks(chosen_rarity)
+    if not pks:
         # fallback if you have no heroes of that rarity yet
-        pool = list(HeroBase.objects.all())
-        if not pool:
+        pks = _hero_base_pks()
+        if not pks:
             return None
 
-    base = random.choice(pool)
+    chosen_pk = random.choice(pks)
 
     with transaction.atomic():
-        # re-check inside transaction (prevents weird double-spend on spam clicks)
-        profile.refresh_from_db()
-        if profile.coins < cost:
+        # Atomic conditional debit: one UPDATE, guarded in SQL, so spam
+        # clicks / parallel workers can't double-spend. Replaces the old
+        # refresh_from_db + Python subtraction + save round-trips.
+        debited = PlayerProfile.objects.filter(
+            pk=profile.pk, coins__gte=cost
+        ).update(coins=models.F("coins") - cost)
+        if not debited:
             return None
+        profile.coins -= cost  # keep the in-memory copy current for callers
 
-        profile.coins -= cost
-        profile.save(update_fields=["coins"])
-
+        # hero_base_id avoids fetching/hydrating the HeroBase row; callers
+        # that need display fields look them up by pk.
         instance = HeroInstance.objects.create(
             owner=profile.user,
-            hero_base=base,
+            hero_base_id=chosen_pk,
             level=1,
             xp=0,
         )
@@ -220,12 +302,38 @@ def xp_to_level_up(level: int) -> int:
     # simple curve
     return 100 + (level - 1) * 50
 
+def _levels_gained(level: int, xp: int) -> int:
+    """
+    Closed-form count of level-ups affordable with `xp` starting at
+    `level`. The curve is an arithmetic series, so the total cost of k
+    level-ups is S(k) = k*cost(level) + 25*k*(k-1); solve S(k) <= xp with
+    the quadratic formula instead of looping once per level.
+    """
+    if xp < xp_to_level_up(level):
+        return 0
+    b = xp_to_level_up(level) - 25
+    k = (math.isqrt(b * b + 100 * xp) - b) // 50
+    # isqrt truncation can land one off the true boundary; nudge back.
+    while k > 0 and k * (b + 25) + 25 * k * (k - 1) > xp:
+        k -= 1
+    return k
+
+def compute_xp_and_level(level: int, xp: int, gained: int) -> tuple[int, int, int]:
+    """
+    Pure form of the xp/level math: returns (new_level, new_xp, leveled)
+    without touching the DB, so callers can batch their writes
+    (campaign_view commits a whole squad with one bulk_update).
+    """
+    xp += gained
+    leveled = _levels_gained(level, xp)
+    if leveled:
+        # Total cost of the levels just gained, same series as above.
+        xp -= leveled * xp_to_level_up(level) + 25 * leveled * (leveled - 1)
+        level += leveled
+    return level, xp, leveled
+
+
 def apply_xp_and_level(hero: HeroInstance, gained: int) -> dict:
-    hero.xp += gained
-    leveled = 0
-    while hero.xp >= xp_to_level_up(hero.level):
-        hero.xp -= xp_to_level_up(hero.level)
-        hero.level += 1
-        leveled += 1
+    hero.level, hero.xp, leveled = compute_xp_and_level(hero.level, hero.xp, gained)
     hero.save()
     return {"gained": gained, "leveled": leveled, "new_level": hero.level, "xp": hero.xp}
@@ -1,10 +1,57 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import PlayerProfile
+from .models import HeroAbilityLoadout, HeroBase, PlayerProfile, _hero_base_pks, _sporeling_pk
 
 @receiver(post_save, sender=User)
 def create_player_profile(sender, instance, created, **kwargs):
     if created:
         PlayerProfile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=HeroBase)
+@receiver(post_delete, sender=HeroBase)
+def clear_hero_base_pk_cache(sender, **kwargs):
+    # The summon pool caches pk lists per rarity (and the campaign enemy
+    # base pk); any catalog write invalidates them.
+    _hero_base_pks.cache_clear()
+    _sporeling_pk.cache_clear()
+
+    # enemy unit templates are built from HeroBase stats; local import
+    # keeps app loading order out of the picture
+    from .views import _enemy_template
+    _enemy_template.cache_clear()
+
+    # bump the library page's row-cache version
+    try:
+        cache.incr("library:version")
+    except ValueError:
+        cache.set("library:version", 2, None)
+
+
+@receiver(pre_save, sender=HeroAbilityLoadout)
+def _stash_previous_loadout_hero(sender, instance, **kwargs):
+    # A loadout row can be re-pointed at another hero; remember who it
+    # belonged to so the post_save recount covers both sides.
+    instance._previous_hero_base_id = (
+        HeroAbilityLoadout.objects.filter(pk=instance.pk)
+        .values_list("hero_base_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=HeroAbilityLoadout)
+@receiver(post_delete, sender=HeroAbilityLoadout)
+def sync_hero_ability_count(sender, instance, **kwargs):
+    # Recompute rather than F() +/- 1: a full recount can never drift.
+    # When the row moved between heroes, recount the old owner too.
+    pks = {instance.hero_base_id, getattr(instance, "_previous_hero_base_id", None)}
+    pks.discard(None)
+    for pk in pks:
+        HeroBase.objects.filter(pk=pk).update(
+            ability_count=HeroAbilityLoadout.objects.filter(hero_base_id=pk).count()
+        )
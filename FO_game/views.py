@@ -1,39 +1,92 @@
+import dataclasses
 import random, json
 
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
 from .engine.battle import (
     battle_state_new,
     battle_state_snapshot,
     battle_state_advance_until_pause,
     battle_state_player_basic_attack,
     build_units_from_instances,
-    build_enemy_units,
+    build_enemy_units_from_template,
+    run_battle,
     DEFAULT_TICK_LIMIT_STEP,
+    PHASE_ENDED,
 )
 
 from .engine.rules import validate_squad, RuleError
 
 from django.shortcuts import render, redirect
+from django.views.decorators.cache import cache_page
 from django.views.decorators.http import require_POST, require_http_methods
 from django.contrib.auth.models import User
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseBadRequest
 
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
-from .models import HeroBase, HeroInstance, PlayerProfile, summon_random_hero, apply_xp_and_level
-from .serializers import HeroBaseSerializer, PlayerProfileSerializer
+from .models import (
+    HeroBase,
+    HeroInstance,
+    PlayerProfile,
+    summon_random_hero,
+    compute_xp_and_level,
+    _sporeling_pk,
+)
+from .serializers import PlayerProfileSerializer
+
+from .engine.kits import get_kit_for_faction
+
+# Columns the battle engine actually reads off a roster row
+# (calc_stats + name/faction for display and kit lookup). Used with
+# .only() so battle endpoints skip description/art columns entirely.
+_BATTLE_INSTANCE_FIELDS = (
+    "id", "level", "xp", "owner_id", "hero_base_id",
+    "hero_base__id", "hero_base__name", "hero_base__faction",
+    "hero_base__base_hp", "hero_base__base_atk", "hero_base__base_def",
+    "hero_base__base_matk", "hero_base__base_mdef", "hero_base__base_speed",
+    "hero_base__growth_hp", "hero_base__growth_atk", "hero_base__growth_def",
+    "hero_base__growth_matk", "hero_base__growth_mdef", "hero_base__growth_speed",
+)
 
-from .engine.kits import get_kit_for
+# Columns heroes.html actually renders per roster card (name/faction/
+# rarity/role plus the base stat block) — keep in sync with the template
+# so .only() never triggers deferred loads.
+_ROSTER_DISPLAY_FIELDS = (
+    "id", "level", "owner_id", "hero_base_id",
+    "hero_base__id", "hero_base__name", "hero_base__faction",
+    "hero_base__rarity", "hero_base__role",
+    "hero_base__base_hp", "hero_base__base_atk", "hero_base__base_def",
+    "hero_base__base_matk", "hero_base__base_mdef", "hero_base__base_speed",
+)
+
+
+# Columns the catalog endpoint exposes. FKs go out as *_id, matching
+# what values() returns — no per-row serializer instantiation needed for
+# a read-only catalog.
+HERO_FIELDS = (
+    "id", "name", "rarity", "element", "faction", "role", "description",
+    "base_hp", "base_atk", "base_def", "base_matk", "base_mdef", "base_speed",
+    "growth_hp", "growth_atk", "growth_def", "growth_matk", "growth_mdef", "growth_speed",
+    "portrait_id", "background_id", "base_idle_sheet_id",
+)
 
 
+@cache_page(300)
 @api_view(["GET"])
 @permission_classes([IsAuthenticatedOrReadOnly])
 def hero_list(request):
-    heroes = HeroBase.objects.all()
-    serializer = HeroBaseSerializer(heroes, many=True)
-    return Response(serializer.data)
+    # values() skips ModelSerializer introspection and model hydration;
+    # the catalog only changes on admin/seed writes, so 5 min of caching
+    # is safe.
+    return Response(list(HeroBase.objects.values(*HERO_FIELDS)))
 
 
 @api_view(["GET"])
@@ -47,18 +100,46 @@ def player_profile(request):
 
 
 def get_current_profile(request):
-    if request.user.is_authenticated:
-        profile, _ = PlayerProfile.objects.get_or_create(user=request.user)
+    # Memoize on the request: views (and anything they call) can ask for
+    # the profile repeatedly without repeating the get_or_create round-trip.
+    profile = getattr(request, "_profile_cache", None)
+    if profile is not None:
         return profile
 
-    # Prototype fallback
-    user = User.objects.first()
-    if not user:
-        return None
-    profile, _ = PlayerProfile.objects.get_or_create(user=user)
+    if request.user.is_authenticated:
+        profile, _ = PlayerProfile.objects.get_or_create(user=request.user)
+    else:
+        # Prototype fallback; only("id") — we just need a pk to hang the
+        # profile on
+        user = User.objects.only("id").first()
+        if not user:
+            return None
+        profile, _ = PlayerProfile.objects.get_or_create(user=user)
+
+    request._profile_cache = profile
     return profile
 
 
+@lru_cache(maxsize=4)
+def _enemy_template(base_pk: int, level: int) -> tuple:
+    """
+    Built-once enemy squad for a given base/level; cleared by the
+    HeroBase signals when the catalog changes.
+    """
+    base = HeroBase.objects.get(pk=base_pk)
+    return tuple(build_enemy_units_from_template(base, 5, level=level))
+
+
+def _spawn_enemy_units(base_pk: int, level: int = 1) -> list:
+    # Fresh mutable copies of the cached template. Abilities and hook
+    # lists stay shared (stateless flyweights, never mutated); the AP
+    # stagger is re-rolled so battles don't all open in the same order.
+    return [
+        dataclasses.replace(u, stats=dict(u.stats), ap=random.randint(0, 20))
+        for u in _enemy_template(base_pk, level)
+    ]
+
+
 def home_view(request):
     profile = get_current_profile(request)
     return render(request, "FO_game/home.html", {
@@ -67,22 +148,82 @@ def home_view(request):
     })
 
 
+# Cell values treated as "empty" (same set rules.py uses; 0 and "0"
+# hash alike on purpose)
+_NULLS = frozenset(("", "0", 0, None))
+
+
 def _anchors_only(row):
     """
     Convert a row list into only anchors (positive ids) / None.
-    Keeps length the same.
+    Keeps length the same; occupied markers (negative ids) become None.
     """
-    out = []
-    for v in (row or []):
-        if v in ("", "0", 0, None):
-            out.append(None)
-            continue
-        v = int(v)
-        if v < 0:
-            out.append(None)  # occupied marker is not an anchor
-        else:
-            out.append(v)
-    return out
+    return [
+        None if v in _NULLS else (iv if (iv := int(v)) > 0 else None)
+        for v in (row or [])
+    ]
+
+
+class _ParsedSquad(NamedTuple):
+    front: tuple
+    mid: tuple | None  # None = legacy 2-row layout
+    back: tuple
+    formation: Mapping  # hero id -> (row, slot); read-only, shared
+    selected_ids: tuple  # deduped, grid order
+
+
+def parse_squad(squad) -> _ParsedSquad:
+    """
+    Shared squad parse for the battle views: normalizes either layout,
+    pads rows, and builds the formation mapping (which doubles as the
+    ordered dedup of selected ids). Saved squads are identical across
+    requests, so the heavy lifting is memoized on the frozen rows.
+    """
+    squad = squad if isinstance(squad, dict) else {}
+    has_mid = "mid" in squad
+    cols = 3 if has_mid else 6
+    raw = (
+        tuple((squad.get("front") or [])[:cols]),
+        tuple((squad.get("mid") or [])[:cols]) if has_mid else None,
+        tuple((squad.get("back") or [])[:cols]),
+    )
+    return _parse_squad_cached(raw, has_mid)
+
+
+@lru_cache(maxsize=128)
+def _parse_squad_cached(raw, has_mid) -> _ParsedSquad:
+    raw_front, raw_mid, raw_back = raw
+    cols = 3 if has_mid else 6
+
+    if has_mid:
+        rows = [
+            ["front", _anchors_only(raw_front)],
+            ["mid", _anchors_only(raw_mid)],
+            ["back", _anchors_only(raw_back)],
+        ]
+    else:
+        rows = [
+            ["front", list(raw_front)],
+            ["back", list(raw_back)],
+        ]
+
+    formation = {}
+    for entry in rows:
+        row_name, row = entry
+        row += [None] * (cols - len(row))
+        for i, hid in enumerate(row):
+            if hid and hid not in formation:
+                formation[int(hid)] = (row_name, i)
+        entry[1] = tuple(row)
+
+    by_name = dict(rows)
+    return _ParsedSquad(
+        front=by_name["front"],
+        mid=by_name.get("mid"),
+        back=by_name["back"],
+        formation=MappingProxyType(formation),
+        selected_ids=tuple(formation),
+    )
 
 
 def campaign_view(request):
@@ -97,46 +238,20 @@ def campaign_view(request):
             "error": "No profile found. Create a user or log in.",
         })
 
-    # load saved squad
-    squad = request.session.get("squad") or {}
-
-    # Detect new 3-row (front/mid/back) vs old 2-row (front/back 6 slots)
-    has_mid = isinstance(squad, dict) and ("mid" in squad)
-
-    if has_mid:
-        front = _anchors_only((squad.get("front") or [])[:3])
-        mid   = _anchors_only((squad.get("mid") or [])[:3])
-        back  = _anchors_only((squad.get("back") or [])[:3])
-
-        front = front + [None] * (3 - len(front))
-        mid   = mid   + [None] * (3 - len(mid))
-        back  = back  + [None] * (3 - len(back))
+    # load saved squad (parse/formation memoized across requests)
+    parsed = parse_squad(request.session.get("squad"))
 
-        selected_ids = [i for i in (front + mid + back) if i]
-        selected_ids = list(dict.fromkeys(selected_ids))
-
-    else:
-        front = (squad.get("front") or [])[:6]
-        back  = (squad.get("back") or [])[:6]
-        front = front + [None] * (6 - len(front))
-        back  = back  + [None] * (6 - len(back))
-
-        selected_ids = [i for i in (front + back) if i]
-        selected_ids = list(dict.fromkeys(selected_ids))
-
-    # fetch instances (owned)
+    # fetch instances (owned); owner_id avoids touching the User row
     roster = list(
-        HeroInstance.objects.filter(owner=profile.user, id__in=selected_ids)
+        HeroInstance.objects.filter(owner_id=profile.user_id, id__in=parsed.selected_ids)
         .select_related("hero_base")
+        .only(*_BATTLE_INSTANCE_FIELDS)
     )
     roster_by_id = {h.id: h for h in roster}
 
     # validate (rules.py now no longer requires 1 front/back)
     try:
-        if has_mid:
-            validate_squad(front, back, roster_by_id, mid=mid)
-        else:
-            validate_squad(front, back, roster_by_id)
+        validate_squad(parsed.front, parsed.back, roster_by_id, mid=parsed.mid)
     except RuleError as e:
         msg = (
             "No squad selected yet. Go to Heroes and save a squad."
@@ -151,44 +266,17 @@ def campaign_view(request):
             "error": msg,
         })
 
-    # build formation mapping expected by engine
-    formation = {}
-
-    if has_mid:
-        for idx, hid in enumerate(front):
-            if hid and hid in roster_by_id:
-                formation[hid] = ("front", idx)
-        for idx, hid in enumerate(mid):
-            if hid and hid in roster_by_id:
-                formation[hid] = ("mid", idx)
-        for idx, hid in enumerate(back):
-            if hid and hid in roster_by_id:
-                formation[hid] = ("back", idx)
-
-        squad_instances = [roster_by_id[hid] for hid in selected_ids if hid in roster_by_id]
-    else:
-        for idx, hid in enumerate(front):
-            if hid and hid in roster_by_id:
-                formation[hid] = ("front", idx)
-        for idx, hid in enumerate(back):
-            if hid and hid in roster_by_id:
-                formation[hid] = ("back", idx)
-
-        squad_instances = [roster_by_id[hid] for hid in selected_ids if hid in roster_by_id]
+    # formation came out of the shared parse; after validation every
+    # anchor is known to be in roster_by_id
+    squad_instances = [roster_by_id[hid] for hid in parsed.selected_ids if hid in roster_by_id]
 
     # engine
-    from .engine.battle import run_battle
-
-    player_units = build_units_from_instances("player", squad_instances, formation)
+    player_units = build_units_from_instances("player", squad_instances, parsed.formation)
 
-    # enemy: 5× Level 1 Fungal Sporeling
-    sporeling = (
-        HeroBase.objects.filter(name__iexact="Fungal Sporeling").first()
-        or HeroBase.objects.filter(name__icontains="Fungal").filter(name__icontains="Spore").first()
-        or HeroBase.objects.filter(name__icontains="Sporeling").first()
-    )
+    # enemy: 5× Level 1 Fungal Sporeling (pk and built units cached)
+    sporeling_pk = _sporeling_pk()
 
-    if not sporeling:
+    if not sporeling_pk:
         return render(request, "FO_game/campaign.html", {
             "active_tab": "campaign",
             "profile": profile,
@@ -197,15 +285,22 @@ def campaign_view(request):
             "error": "Enemy base not found: 'Fungal Sporeling'. Make sure it's seeded in HeroBase.",
         })
 
-    enemy_units = build_enemy_units([sporeling] * 5, level=1)
+    enemy_units = _spawn_enemy_units(sporeling_pk, level=1)
 
     battle_result = run_battle(player_units, enemy_units, seed=None, tick_limit=100)
 
-    # award XP only to participating instances
+    # award XP only to participating instances; one bulk_update instead
+    # of a save per hero
     xp_results = {}
     for inst in squad_instances:
         gained = battle_result["xp"].get(inst.id, 0)
-        xp_results[inst.id] = apply_xp_and_level(inst, gained)
+        inst.level, inst.xp, leveled = compute_xp_and_level(inst.level, inst.xp, gained)
+        xp_results[inst.id] = {
+            "gained": gained, "leveled": leveled, "new_level": inst.level, "xp": inst.xp,
+        }
+    if squad_instances:
+        with transaction.atomic():
+            HeroInstance.objects.bulk_update(squad_instances, ["level", "xp"])
 
     return render(request, "FO_game/campaign.html", {
         "active_tab": "campaign",
@@ -234,12 +329,15 @@ def heroes_view(request):
             "error": "No profile found."
         })
 
-    roster = list(
-        HeroInstance.objects.filter(owner=profile.user)
-        .select_related("hero_base")
-        .order_by("-level", "-id")
-    )
-    roster_by_id = {h.id: h for h in roster}
+    def load_full_roster():
+        # Only needed for rendering; validation on POST gets by with a
+        # much narrower query over the referenced ids.
+        return list(
+            HeroInstance.objects.filter(owner_id=profile.user_id)
+            .select_related("hero_base")
+            .only(*_ROSTER_DISPLAY_FIELDS)
+            .order_by("-level", "-id")
+        )
 
     saved = False
     error = None
@@ -250,15 +348,19 @@ def heroes_view(request):
         raw = request.POST.get("squad_json", "")
         try:
             payload = json.loads(raw)
-            front = payload.get("front", [])
-            mid   = payload.get("mid", [])
-            back  = payload.get("back", [])
-        except Exception:
-            return HttpResponseBadRequest("Invalid squad payload.")
+        except ValueError:
+            return HttpResponseBadRequest("Invalid JSON.")
+        if not isinstance(payload, dict):
+            return HttpResponseBadRequest("Expected a JSON object.")
+
+        front = payload.get("front") or []
+        mid   = payload.get("mid") or []
+        back  = payload.get("back") or []
 
         # normalize to 3 cols each (keep negatives, your rules.py supports them)
         def norm3(row):
-            row = list(row or [])
+            if not isinstance(row, (list, tuple)):
+                return [None, None, None]
             out = []
             for i in range(3):
                 v = row[i] if i < len(row) else None
@@ -267,19 +369,31 @@ def heroes_view(request):
                 out.append(int(v) if v is not None else None)
             return out
 
-        front = norm3(front)
-        mid   = norm3(mid)
-        back  = norm3(back)
+        try:
+            front = norm3(front)
+            mid   = norm3(mid)
+            back  = norm3(back)
+        except (TypeError, ValueError):
+            # non-numeric cell values
+            return HttpResponseBadRequest("Invalid squad payload.")
 
-        # validate anchors + ownership + max size
+        # validate anchors + ownership + max size; fetch just the
+        # referenced instances instead of the whole ordered roster
+        referenced = {v for row in (front, mid, back) for v in row if v and v > 0}
+        owned_by_id = {
+            h.id: h
+            for h in HeroInstance.objects.filter(
+                owner_id=profile.user_id, id__in=referenced
+            ).only("id")
+        }
         try:
-            validate_squad(front, back, roster_by_id, mid=mid)
+            validate_squad(front, back, owned_by_id, mid=mid)
         except RuleError as e:
             error = e.message
             return render(request, "FO_game/heroes.html", {
                 "active_tab": "heroes",
                 "profile": profile,
-                "roster": roster,
+                "roster": load_full_roster(),
                 "current": request.session.get("squad"),
                 "current_units": None,
                 "saved": False,
@@ -292,6 +406,9 @@ def heroes_view(request):
 
     current = request.session.get("squad")
 
+    roster = load_full_roster()
+    roster_by_id = {h.id: h for h in roster}
+
     # resolve for display (anchors only)
     current_units = None
     if current and isinstance(current, dict):
@@ -328,17 +445,44 @@ def heroes_view(request):
     })
 
 
+# Columns library.html renders per catalog row; plain dicts so the
+# cached rows survive any cache backend.
+_LIBRARY_FIELDS = (
+    "id", "name", "description", "faction", "rarity", "role", "element",
+    "base_hp", "base_atk", "base_def", "base_matk", "base_mdef", "base_speed",
+    "growth_hp", "growth_atk", "growth_def", "growth_matk", "growth_mdef", "growth_speed",
+)
+
+
+def library_version() -> int:
+    return cache.get_or_set("library:version", 1, None)
+
+
 def library_view(request):
     profile = get_current_profile(request)
-    heroes = HeroBase.objects.all().order_by("faction", "rarity", "name")
-
-    hero_rows = []
-    for hb in heroes:
-        kit = get_kit_for(hb)
-        hero_rows.append({
-            "hero": hb,
-            "abilities": [ab.describe() for ab in kit],
-        })
+
+    # The catalog is effectively immutable between admin/seed writes, so
+    # the built rows are cached under a version that the HeroBase
+    # signals bump — a warm request is one cache.get plus the render.
+    version = library_version()
+    hero_rows = cache.get("library:hero_rows", version=version)
+
+    if hero_rows is None:
+        # Kits are code-defined per faction (no DB hit), and the
+        # describe() payload is identical for every hero of a faction —
+        # build it once per faction instead of once per hero.
+        hero_rows = []
+        kit_rows_by_faction = {}
+        for hb in HeroBase.objects.values(*_LIBRARY_FIELDS).order_by("faction", "rarity", "name"):
+            abilities = kit_rows_by_faction.get(hb["faction"])
+            if abilities is None:
+                abilities = [ab.describe() for ab in get_kit_for_faction(hb["faction"])]
+                kit_rows_by_faction[hb["faction"]] = abilities
+            hero_rows.append({
+                "hero": hb,
+                "abilities": abilities,
+            })
+        cache.set("library:hero_rows", hero_rows, 3600, version=version)
 
     return render(request, "FO_game/library.html", {
         "active_tab": "library",
@@ -355,8 +499,9 @@ def summon_one(request):
     if hero is None:
         request.session["last_summon_msg"] = "Not enough coins to summon."
     else:
-        name = hero.hero_base.name
-        rarity = hero.hero_base.rarity
+        # summon_random_hero creates via hero_base_id, so hero.hero_base
+        # would lazy-load the whole row; fetch just the toast fields.
+        name, rarity = HeroBase.objects.values_list("name", "rarity").get(pk=hero.hero_base_id)
         request.session["last_summon_msg"] = f"You summoned: {name} ({rarity})!"
 
     return redirect("summon")
@@ -373,107 +518,130 @@ def summon_view(request):
     })
 
 
-@require_POST
-def api_battle_start(request):
-    profile = get_current_profile(request)
-    if not profile:
-        return JsonResponse({"ok": False, "error": "No profile found."}, status=400)
+# Battle states live in the cache keyed by battle_id; the session only
+# carries the id. This avoids re-serializing the whole state dict into
+# the session backend (SELECT + UPDATE per step on DB-backed sessions).
+_BATTLE_STATE_TIMEOUT = 3600  # seconds an idle battle survives
 
-    squad = request.session.get("squad")
-    if not squad:
-        return JsonResponse({"ok": False, "error": "No squad saved. Go to Heroes."}, status=400)
 
-    has_mid = isinstance(squad, dict) and ("mid" in squad)
+def _json_response(payload, status=200):
+    # Leaner than JsonResponse for the polled battle endpoints: compact
+    # separators and a straight json.dumps — snapshots are plain JSON
+    # types, so DjangoJSONEncoder's type dispatch buys nothing. (orjson
+    # would be faster still, but it isn't a dependency of this project.)
+    return HttpResponse(
+        json.dumps(payload, separators=(",", ":")),
+        content_type="application/json",
+        status=status,
+    )
 
-    roster = list(HeroInstance.objects.filter(owner=profile.user).select_related("hero_base"))
-    roster_by_id = {h.id: h for h in roster}
 
-    if has_mid:
-        front = _anchors_only((squad.get("front") or [])[:3])
-        mid   = _anchors_only((squad.get("mid") or [])[:3])
-        back  = _anchors_only((squad.get("back") or [])[:3])
-        front = front + [None] * (3 - len(front))
-        mid   = mid   + [None] * (3 - len(mid))
-        back  = back  + [None] * (3 - len(back))
+def _battle_cache_key(battle_id):
+    return f"battle:{battle_id}"
 
-        try:
-            validate_squad(front, back, roster_by_id, mid=mid)
-        except RuleError as e:
-            return JsonResponse({"ok": False, "error": e.message, "code": e.code}, status=400)
 
-        formation = {}
-        for i, hid in enumerate(front):
-            if hid:
-                formation[int(hid)] = ("front", i)
-        for i, hid in enumerate(mid):
-            if hid:
-                formation[int(hid)] = ("mid", i)
-        for i, hid in enumerate(back):
-            if hid:
-                formation[int(hid)] = ("back", i)
+def _load_battle_state(request):
+    battle_id = request.session.get("battle_id")
+    if battle_id:
+        state = cache.get(_battle_cache_key(battle_id))
+        if state is not None:
+            return state
+    # legacy sessions stored the whole state dict directly
+    return request.session.get("battle_state")
 
-        chosen = [hid for hid in (front + mid + back) if hid][:5]
 
+def _save_battle_state(request, state):
+    battle_id = state.get("battle_id")
+    if battle_id:
+        cache.set(_battle_cache_key(battle_id), state, _BATTLE_STATE_TIMEOUT)
+        if request.session.get("battle_id") != battle_id:
+            request.session["battle_id"] = battle_id
+            request.session.pop("battle_state", None)
+            request.session.modified = True
     else:
-        front = (squad.get("front") or [])[:6]
-        back  = (squad.get("back") or [])[:6]
-        try:
-            validate_squad(front, back, roster_by_id)
-        except RuleError as e:
-            return JsonResponse({"ok": False, "error": e.message, "code": e.code}, status=400)
+        # pre-battle_id state dicts keep the old session path
+        request.session["battle_state"] = state
+        request.session.modified = True
 
-        formation = {}
-        for i, hid in enumerate(front):
-            if hid:
-                formation[int(hid)] = ("front", i)
-        for i, hid in enumerate(back):
-            if hid:
-                formation[int(hid)] = ("back", i)
 
-        chosen = [hid for hid in (front + back) if hid][:5]
+@require_POST
+def api_battle_start(request):
+    profile = get_current_profile(request)
+    if not profile:
+        return _json_response({"ok": False, "error": "No profile found."}, status=400)
 
-    player_insts = [roster_by_id[hid] for hid in chosen if hid in roster_by_id]
-    player_units = build_units_from_instances("player", player_insts, formation)
+    squad = request.session.get("squad")
+    if not squad:
+        return _json_response({"ok": False, "error": "No squad saved. Go to Heroes."}, status=400)
 
-    # enemy squad: 5 units
-    enemy_base = HeroBase.objects.filter(name__icontains="spore").first()
-    if enemy_base is None:
-        enemy_base = HeroBase.objects.filter(faction="Wild").first()
-    if enemy_base is None:
-        enemy_base = HeroBase.objects.first()
+    parsed = parse_squad(squad)
 
-    if enemy_base is None:
-        return JsonResponse({"ok": False, "error": "No HeroBase rows exist to spawn enemies."}, status=400)
+    # Fetch only the referenced instances (not the whole roster) in one
+    # query; ownership still falls out of validate_squad, since anything
+    # not owned simply won't be in roster_by_id.
+    roster = list(
+        HeroInstance.objects.filter(owner_id=profile.user_id, id__in=parsed.selected_ids)
+        .select_related("hero_base")
+        .only(*_BATTLE_INSTANCE_FIELDS)
+    )
+    roster_by_id = {h.id: h for h in roster}
 
-    enemy_units = build_enemy_units([enemy_base] * 5, level=1)
+    try:
+        validate_squad(parsed.front, parsed.back, roster_by_id, mid=parsed.mid)
+    except RuleError as e:
+        return _json_response({"ok": False, "error": e.message, "code": e.code}, status=400)
+
+    chosen = parsed.selected_ids[:5]
+    player_insts = [roster_by_id[hid] for hid in chosen if hid in roster_by_id]
+    player_units = build_units_from_instances("player", player_insts, parsed.formation)
+
+    # enemy squad: 5 units (sporeling pk and built units cached)
+    enemy_pk = _sporeling_pk()
+    if enemy_pk is None:
+        fallback = (
+            HeroBase.objects.filter(faction="Wild").only("id").first()
+            or HeroBase.objects.only("id").first()
+        )
+        enemy_pk = fallback.pk if fallback else None
+
+    if enemy_pk is None:
+        return _json_response({"ok": False, "error": "No HeroBase rows exist to spawn enemies."}, status=400)
+
+    enemy_units = _spawn_enemy_units(enemy_pk, level=1)
 
     state = battle_state_new(player_units, enemy_units, seed=1337, tick_limit=DEFAULT_TICK_LIMIT_STEP)
     state = battle_state_advance_until_pause(state)
 
-    request.session["battle_state"] = state
-    request.session.modified = True
+    _save_battle_state(request, state)
 
-    return JsonResponse({"ok": True, "snapshot": battle_state_snapshot(state)})
+    return _json_response({"ok": True, "snapshot": battle_state_snapshot(state)})
 
 
 @require_POST
 def api_battle_step(request):
-    state = request.session.get("battle_state")
+    state = _load_battle_state(request)
     if not state:
-        return JsonResponse({"ok": False, "error": "No active battle. Start first."}, status=400)
+        return _json_response({"ok": False, "error": "No active battle. Start first."}, status=400)
+
+    # trailing client polls after the battle ends: answer from the
+    # stored state without advancing or re-saving anything
+    if state.get("phase") == PHASE_ENDED:
+        return _json_response({"ok": True, "snapshot": battle_state_snapshot(state)})
 
     state = battle_state_advance_until_pause(state)
-    request.session["battle_state"] = state
-    request.session.modified = True
+    _save_battle_state(request, state)
 
-    return JsonResponse({"ok": True, "snapshot": battle_state_snapshot(state)})
+    return _json_response({"ok": True, "snapshot": battle_state_snapshot(state)})
 
 
 @require_POST
 def api_battle_act(request):
-    state = request.session.get("battle_state")
+    state = _load_battle_state(request)
     if not state:
-        return JsonResponse({"ok": False, "error": "No active battle. Start first."}, status=400)
+        return _json_response({"ok": False, "error": "No active battle. Start first."}, status=400)
+
+    if state.get("phase") == PHASE_ENDED:
+        return _json_response({"ok": True, "snapshot": battle_state_snapshot(state)})
 
     try:
         payload = json.loads(request.body.decode("utf-8"))
@@ -485,10 +653,9 @@ def api_battle_act(request):
     target_slot = payload.get("target_slot")
 
     if target_row not in ("front", "mid", "back") or target_slot is None:
-        return JsonResponse({"ok": False, "error": "Missing target."}, status=400)
+        return _json_response({"ok": False, "error": "Missing target."}, status=400)
 
     state = battle_state_player_basic_attack(state, target_side, target_row, int(target_slot))
-    request.session["battle_state"] = state
-    request.session.modified = True
+    _save_battle_state(request, state)
 
-    return JsonResponse({"ok": True, "snapshot": battle_state_snapshot(state)})
+    return _json_response({"ok": True, "snapshot": battle_state_snapshot(state)})